@@ -0,0 +1,239 @@
+import os
+import json
+import fnmatch
+import hashlib
+import pandas as pd
+import logging
+from merge_engine import (coerce_column_types, check_dataset_quality, rank_dataframes_by_common_columns,
+                          deduplicate_dataframes, drop_duplicate_rows, apply_time_joins, verify_merge,
+                          check_nan_rows_columns)
+from indexed_csv import write_indexed_csv
+from snapshot_store import commit_snapshot
+
+# Initialize logging
+logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+
+PROFILE_DEFAULTS = {
+    'include': ['*.csv'],
+    'exclude': [],
+    'start_table': None,
+    'how': 'outer',
+    'key_columns': None,
+    'dtypes': {},
+    'normalize_columns': False,
+    'time_joins': {},
+    'deduplicate': False,
+    'quality_check': False,
+    'check_nan': False,
+    'verify': False,
+    'sort_by': None,
+    'snapshot_dir': None,
+}
+REQUIRED_PROFILE_KEYS = ('name', 'input_dir', 'output_file')
+
+
+def load_profile(profile_path):
+    """Read a dataset profile (JSON) and fill in the defaults for optional settings."""
+    with open(profile_path, 'r', encoding='utf-8') as f:
+        profile = json.load(f)
+
+    missing = [key for key in REQUIRED_PROFILE_KEYS if key not in profile]
+    if missing:
+        raise ValueError(f"Profile {profile_path} is missing required settings: {missing}")
+    unknown = set(profile) - set(PROFILE_DEFAULTS) - set(REQUIRED_PROFILE_KEYS)
+    if unknown:
+        raise ValueError(f"Profile {profile_path} has unknown settings: {sorted(unknown)}")
+    return {**PROFILE_DEFAULTS, **profile}
+
+
+def _normalize_column(column, profile):
+    return column.strip().upper() if profile['normalize_columns'] else column
+
+
+def _pinned_dtype(dtype):
+    """Map an inferred dtype to the dtype passed to read_csv on later runs."""
+    if pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_bool_dtype(dtype):
+        return str(dtype)
+    return 'str'
+
+
+def _source_files(profile):
+    """Return the CSV files selected by the include and exclude patterns, sorted by name."""
+    return sorted(
+        filename for filename in os.listdir(profile['input_dir'])
+        if any(fnmatch.fnmatch(filename, pattern) for pattern in profile['include'])
+        and not any(fnmatch.fnmatch(filename, pattern) for pattern in profile['exclude'])
+    )
+
+
+def _fingerprint(profile):
+    """Identify the profile contents and the current state of its source files."""
+    sources = {}
+    for filename in _source_files(profile):
+        stat = os.stat(os.path.join(profile['input_dir'], filename))
+        sources[filename] = [stat.st_size, stat.st_mtime_ns]
+    profile_hash = hashlib.sha256(json.dumps(profile, sort_keys=True).encode('utf-8')).hexdigest()
+    return {'profile_sha256': profile_hash, 'sources': sources}
+
+
+def _merged_columns(left_columns, right_columns, on):
+    """Column names pd.merge produces, including the _x/_y suffixes for overlapping non-key columns."""
+    overlap = (set(left_columns) & set(right_columns)) - set(on)
+    return ([column + '_x' if column in overlap else column for column in left_columns]
+            + [column + '_y' if column in overlap else column for column in right_columns if column not in on])
+
+
+def compile_plan(profile):
+    """Load every source table once and derive the pinned dtypes and join order for the profile.
+
+    The join order follows merge_dataframes: start with the start table and repeatedly
+    join the table sharing the most columns with the result so far. Only column names
+    are needed for that, so the plan is computed without performing any merge.
+    """
+    filenames = _source_files(profile)
+    tables = {}
+    dtypes = {}
+    for filename in filenames:
+        df = pd.read_csv(os.path.join(profile['input_dir'], filename), low_memory=False)
+        df.columns = [_normalize_column(column, profile) for column in df.columns]
+        tables[filename] = df
+        dtypes[filename] = {column: _pinned_dtype(dtype) for column, dtype in df.dtypes.items()}
+        for column, dtype in profile['dtypes'].items():
+            if column in dtypes[filename]:
+                dtypes[filename][column] = dtype
+        logging.info(f"Profiled {filename} with columns: {df.columns.tolist()}")
+
+    time_joins = profile['time_joins']
+    unselected = sorted(set(time_joins) - set(filenames))
+    if unselected:
+        raise ValueError(f"time_joins refers to files that are not among the selected files {filenames}: {unselected}")
+
+    exact_tables = {key: df for key, df in tables.items() if key not in time_joins}
+    if profile['start_table']:
+        start_table = profile['start_table']
+    elif len(exact_tables) == 1:
+        start_table = next(iter(exact_tables))
+    elif exact_tables:
+        start_table = rank_dataframes_by_common_columns(exact_tables)[0][0]
+    else:
+        raise ValueError(f"Profile {profile['name']} selects no table to start the merge from: "
+                         f"all files {filenames} are time-joined.")
+    if start_table not in exact_tables:
+        raise ValueError(f"Start table {start_table} is not among the selected files: {filenames}")
+
+    columns = list(exact_tables[start_table].columns)
+    remaining = {key: list(df.columns) for key, df in exact_tables.items() if key != start_table}
+    steps = []
+    while remaining:
+        best_match_key = None
+        best_common_columns = []
+        for key, table_columns in remaining.items():
+            common_columns = set(columns).intersection(table_columns)
+            if len(common_columns) > len(best_common_columns):
+                best_match_key = key
+                best_common_columns = common_columns
+        if not best_common_columns:
+            raise ValueError(f"No common columns found for merging with {sorted(remaining)}.")
+
+        on = list(profile['key_columns']) if profile['key_columns'] else sorted(best_common_columns)
+        steps.append({'table': best_match_key, 'on': on})
+        columns = _merged_columns(columns, remaining.pop(best_match_key), on)
+
+    # Key columns get one dtype in every table that holds them, as coerce_column_types would choose
+    for column in {column for step in steps for column in step['on']}:
+        holders = [key for key in exact_tables if column in dtypes[key]]
+        kinds = {dtypes[key][column] for key in holders}
+        if len(kinds) > 1:
+            numeric = all(pd.api.types.is_numeric_dtype(exact_tables[key][column]) for key in holders)
+            for key in holders:
+                dtypes[key][column] = 'float64' if numeric else 'str'
+
+    plan = {
+        'name': profile['name'],
+        'fingerprint': _fingerprint(profile),
+        'dtypes': dtypes,
+        'start_table': start_table,
+        'steps': steps,
+    }
+    logging.info(f"Compiled plan for {profile['name']}: start with {start_table}, then "
+                 f"{[step['table'] for step in steps]}")
+    return plan
+
+
+def load_plan(profile, cache_dir):
+    """Return the cached plan for the profile, recompiling it if the profile or any source file changed."""
+    plan_path = os.path.join(cache_dir, profile['name'] + '.plan.json')
+    if os.path.exists(plan_path):
+        with open(plan_path, 'r', encoding='utf-8') as f:
+            plan = json.load(f)
+        if plan['fingerprint'] == _fingerprint(profile):
+            logging.info(f"Using cached plan '{plan_path}'")
+            return plan
+        logging.info(f"Profile or source files changed since '{plan_path}' was compiled.")
+
+    plan = compile_plan(profile)
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(plan_path, 'w', encoding='utf-8') as f:
+        json.dump(plan, f, indent=2)
+    return plan
+
+
+def execute_plan(plan, profile):
+    """Load the source tables with their pinned dtypes and merge them in the planned order."""
+    tables = {}
+    for filename, dtypes in plan['dtypes'].items():
+        file_path = os.path.join(profile['input_dir'], filename)
+        if profile['normalize_columns']:
+            header = pd.read_csv(file_path, nrows=0).columns
+            dtypes = {raw: dtypes[_normalize_column(raw, profile)] for raw in header}
+        df = pd.read_csv(file_path, dtype=dtypes)
+        df.columns = [_normalize_column(column, profile) for column in df.columns]
+        tables[filename] = df
+
+    if profile['quality_check']:
+        quality_passed, issues, _, _ = check_dataset_quality(tables)
+        if not quality_passed:
+            logging.error("Datasets failed the quality check. Please address the following issues:")
+            for issue in issues:
+                logging.error(issue)
+            return None
+
+    if profile['deduplicate']:
+        # Only an outer join keeps every row of every file; the other joins need rows shared
+        # by two files in both of them, so there only repeats within a file are dropped
+        deduplicate_dataframes(tables, across_files=profile['how'] == 'outer')
+
+    merged_df = tables[plan['start_table']]
+    logging.info(f"Starting merge with {plan['start_table']}")
+    for step in plan['steps']:
+        logging.info(f"Merging with {step['table']} on columns: {step['on']}")
+        coerce_column_types(merged_df, tables[step['table']], step['on'])
+        merged_df = pd.merge(merged_df, tables[step['table']], on=step['on'], how=profile['how'])
+
+    time_frames = {key: tables[key] for key in profile['time_joins']}
+    merged_df = apply_time_joins(merged_df, time_frames, profile['time_joins'])
+
+    if profile['deduplicate']:
+        merged_df, _ = drop_duplicate_rows(merged_df)
+    if profile['check_nan']:
+        check_nan_rows_columns(merged_df)
+    if profile['verify']:
+        verify_merge(merged_df, tables)
+    return merged_df
+
+
+def run_profile(profile_path, cache_dir=None):
+    """Merge a dataset as described by its profile and save the unified output."""
+    profile = load_profile(profile_path)
+    cache_dir = cache_dir or os.path.join(os.path.dirname(os.path.abspath(profile_path)), '.plan_cache')
+    plan = load_plan(profile, cache_dir)
+
+    merged_data = execute_plan(plan, profile)
+    if merged_data is None:
+        return None
+
+    write_indexed_csv(merged_data, profile['output_file'], sort_by=profile['sort_by'])
+    logging.info(f"Final merged data saved to '{profile['output_file']}'")
+    if profile['snapshot_dir']:
+        commit_snapshot(profile['snapshot_dir'], profile['output_file'], label=profile['name'])
+    return merged_data
@@ -0,0 +1,187 @@
+import io
+import json
+import operator
+import numpy as np
+import pandas as pd
+import logging
+
+# Initialize logging
+logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+
+INDEX_SUFFIX = '.index.json'
+
+COMPARISONS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+
+
+def _to_json_value(value):
+    """Convert NumPy scalars to plain Python values for the JSON index."""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _column_stats(chunk):
+    """Return {column: [min, max]} over the non-null values of each column, None if all are null."""
+    stats = {}
+    for column in chunk.columns:
+        values = chunk[column].dropna()
+        if values.empty:
+            stats[column] = None
+            continue
+        try:
+            if not pd.api.types.is_numeric_dtype(values):
+                values = values.astype(str)
+            stats[column] = [_to_json_value(values.min()), _to_json_value(values.max())]
+        except TypeError:
+            # No usable ordering; the chunk is never skipped on this column
+            logging.debug(f"No min/max statistics for column {column}")
+    return stats
+
+
+def _read_dtype(dtype):
+    """Map a DataFrame dtype to the dtype used when reading chunks back, so every chunk parses alike."""
+    if pd.api.types.is_bool_dtype(dtype):
+        return 'boolean'
+    if pd.api.types.is_numeric_dtype(dtype):
+        return str(dtype)
+    return 'str'
+
+
+def write_indexed_csv(df, output_file, sort_by=None, rows_per_chunk=50_000):
+    """Write df as CSV together with a sidecar index for read_indexed_csv.
+
+    Rows are sorted by sort_by first so each chunk covers a narrow key range. The index
+    (`<output_file>.index.json`) records the byte offset, length and per-column min/max of
+    every chunk of rows_per_chunk rows, which lets readers skip chunks that cannot match.
+    """
+    if sort_by:
+        df = df.sort_values(sort_by, kind='mergesort', na_position='last')
+
+    index = {
+        'columns': df.columns.tolist(),
+        'dtypes': {column: _read_dtype(dtype) for column, dtype in df.dtypes.items()},
+        'sort_by': list(sort_by or []),
+        'rows': len(df),
+        'chunks': [],
+    }
+
+    with open(output_file, 'wb') as f:
+        header = df.iloc[:0].to_csv(index=False).encode('utf-8')
+        f.write(header)
+        index['header_length'] = len(header)
+        for start in range(0, len(df), rows_per_chunk):
+            chunk = df.iloc[start:start + rows_per_chunk]
+            data = chunk.to_csv(index=False, header=False).encode('utf-8')
+            index['chunks'].append({
+                'offset': f.tell(),
+                'length': len(data),
+                'rows': len(chunk),
+                'stats': _column_stats(chunk),
+            })
+            f.write(data)
+
+    with open(output_file + INDEX_SUFFIX, 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=2)
+    logging.info(f"Wrote {len(df)} rows in {len(index['chunks'])} indexed chunks to '{output_file}'")
+
+
+def _chunk_may_match(stats, filters):
+    """Decide from a chunk's min/max statistics whether any of its rows can satisfy all filters."""
+    for column, op, value in filters:
+        if column not in stats:
+            continue
+        if stats[column] is None:
+            return False
+        low, high = stats[column]
+        try:
+            if op == '==' and not low <= value <= high:
+                return False
+            if op == '!=' and low == high == value:
+                return False
+            if op == '<' and not low < value:
+                return False
+            if op == '<=' and not low <= value:
+                return False
+            if op == '>' and not high > value:
+                return False
+            if op == '>=' and not high >= value:
+                return False
+            if op == 'in' and not any(low <= v <= high for v in value):
+                return False
+            if op == 'between' and (value[1] < low or value[0] > high):
+                return False
+        except TypeError:
+            # Filter value and statistics are not comparable, so the chunk has to be read
+            continue
+    return True
+
+
+def _filter_mask(df, filters):
+    """Evaluate the filters row by row on the loaded chunks; missing values never match."""
+    mask = pd.Series(True, index=df.index)
+    for column, op, value in filters:
+        mask &= df[column].notna()
+        if op in COMPARISONS:
+            mask &= COMPARISONS[op](df[column], value)
+        elif op == 'in':
+            mask &= df[column].isin(value)
+        elif op == 'between':
+            mask &= df[column].between(value[0], value[1])
+        else:
+            raise ValueError(f"Unsupported filter operator '{op}' for column {column}")
+    return mask
+
+
+def load_index(path):
+    with open(path + INDEX_SUFFIX, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def read_indexed_csv(path, columns=None, filters=None):
+    """Read selected columns and rows of an indexed CSV, loading only chunks that can match.
+
+    filters is a list of (column, op, value) with op one of ==, !=, <, <=, >, >=, in or
+    between (value is then a (low, high) pair); all filters must hold and rows with a missing
+    value in a filter column never match. Non-numeric columns are compared as strings, so
+    dates should be given in the ISO form used in the file.
+    """
+    index = load_index(path)
+    filters = filters or []
+    for column, op, _ in filters:
+        if column not in index['columns']:
+            raise ValueError(f"Filter column {column} is not in {path}")
+        if op not in COMPARISONS and op not in ('in', 'between'):
+            raise ValueError(f"Unsupported filter operator '{op}' for column {column}")
+
+    columns = columns or index['columns']
+    needed = [column for column in index['columns'] if column in columns or column in {f[0] for f in filters}]
+    selected = [chunk for chunk in index['chunks'] if _chunk_may_match(chunk['stats'], filters)]
+    logging.info(f"Reading {len(selected)} of {len(index['chunks'])} chunks from '{path}'")
+
+    # Neighbouring chunks are read with a single seek and parse
+    ranges = []
+    for chunk in selected:
+        if ranges and ranges[-1][1] == chunk['offset']:
+            ranges[-1][1] = chunk['offset'] + chunk['length']
+        else:
+            ranges.append([chunk['offset'], chunk['offset'] + chunk['length']])
+
+    frames = []
+    with open(path, 'rb') as f:
+        header = f.read(index['header_length'])
+        for start, end in ranges:
+            f.seek(start)
+            frames.append(pd.read_csv(io.BytesIO(header + f.read(end - start)), usecols=needed,
+                                      dtype={column: index['dtypes'][column] for column in needed}))
+
+    if not frames:
+        return pd.DataFrame({column: pd.Series(dtype=index['dtypes'][column]) for column in columns})
+    df = pd.concat(frames, ignore_index=True)
+    if filters:
+        df = df[_filter_mask(df, filters)].reset_index(drop=True)
+    return df[columns]
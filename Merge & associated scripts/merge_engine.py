@@ -0,0 +1,471 @@
+import os
+import numpy as np
+import pandas as pd
+import logging
+from collections import defaultdict
+
+# Initialize logging
+logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+
+INTERVAL_AGGREGATIONS = ('count', 'sum', 'mean', 'min', 'max')
+
+
+def load_dataframes(directory):
+    dataframes = {}
+    for filename in os.listdir(directory):
+        if filename.endswith('.csv'):
+            file_path = os.path.join(directory, filename)
+            try:
+                df = pd.read_csv(file_path, low_memory=False)
+                df.columns = [col.strip().upper() for col in df.columns]  # Normalize column names
+                dataframes[filename] = df
+                logging.info(f"Loaded {filename} with columns: {df.columns.tolist()}")
+                print(f"\nDataFrame loaded from {filename}:")
+                print(df.head())
+            except Exception as e:
+                logging.error(f"Failed to load {filename}: {e}")
+    return dataframes
+
+
+def find_common_columns(df1, df2):
+    """Find common columns between two DataFrames."""
+    return list(set(df1.columns).intersection(set(df2.columns)))
+
+
+def find_common_columns_across_all(dataframes):
+    """Find common columns across all DataFrames."""
+    common_columns = set(dataframes[next(iter(dataframes))].columns)
+    for df in dataframes.values():
+        common_columns.intersection_update(df.columns)
+        if not common_columns:
+            break
+    return list(common_columns)
+
+
+def coerce_column_types(df1, df2, columns):
+    """Coerce column types to be the same for merging."""
+    for column in columns:
+        if df1[column].dtype != df2[column].dtype:
+            if pd.api.types.is_numeric_dtype(df1[column]) and pd.api.types.is_numeric_dtype(df2[column]):
+                df1[column] = df1[column].astype(float)
+                df2[column] = df2[column].astype(float)
+            else:
+                df1[column] = df1[column].astype(str)
+                df2[column] = df2[column].astype(str)
+
+
+def check_dataset_quality(dataframes):
+    """Perform precheck on the datasets to assess their quality and suitability for merging."""
+    quality_issues = []
+    overall_common_columns = set()
+    columns_to_remove = set()
+    rows_to_remove = defaultdict(list)
+
+    for key, df in dataframes.items():
+        # Check for missing values
+        if df.isnull().values.any():
+            logging.warning(f"{key} contains missing values.")
+
+        # Check for rows that only contain NaNs (excluding the first row)
+        nan_rows = df.iloc[1:].index[df.iloc[1:].isna().all(axis=1)]
+        if not nan_rows.empty:
+            quality_issues.append(f"{key} contains rows with all NaN values: {nan_rows.tolist()}")
+            rows_to_remove[key].extend(nan_rows.tolist())
+
+        # Check for columns that only contain NaNs (excluding the first row)
+        nan_columns = df.columns[df.iloc[1:].isna().all()]
+        if not nan_columns.empty:
+            columns_to_remove.update(nan_columns)
+            quality_issues.append(f"{key} contains columns with all NaN values: {nan_columns.tolist()}")
+
+    # Check for at least one common column across datasets
+    keys = list(dataframes.keys())
+    for i in range(len(keys)):
+        for j in range(i + 1, len(keys)):
+            df1, df2 = dataframes[keys[i]], dataframes[keys[j]]
+            common_columns = find_common_columns(df1, df2)
+            if common_columns:
+                overall_common_columns.update(common_columns)
+
+    if not overall_common_columns:
+        quality_issues.append("No common columns found across datasets.")
+
+    if quality_issues:
+        for issue in quality_issues:
+            logging.warning(issue)
+        return False, quality_issues, columns_to_remove, rows_to_remove
+    else:
+        logging.info("All datasets passed the quality check.")
+        return True, [], columns_to_remove, rows_to_remove
+
+
+def rank_dataframes_by_common_columns(dataframes):
+    """Rank dataframes based on the number of common columns with other dataframes."""
+    common_columns_count = defaultdict(int)
+    keys = list(dataframes.keys())
+
+    for i in range(len(keys)):
+        for j in range(i + 1, len(keys)):
+            df1, df2 = dataframes[keys[i]], dataframes[keys[j]]
+            common_columns = find_common_columns(df1, df2)
+            common_columns_count[keys[i]] += len(common_columns)
+            common_columns_count[keys[j]] += len(common_columns)
+
+    ranked_dataframes = sorted(common_columns_count.items(), key=lambda item: item[1], reverse=True)
+    return ranked_dataframes
+
+
+def _as_sort_key(series):
+    """Return a numeric or datetime64[ns] version of a column that can be sorted on."""
+    if pd.api.types.is_numeric_dtype(series):
+        return series
+    return pd.to_datetime(series, errors='coerce').astype('datetime64[ns]')
+
+
+def _as_float(series):
+    """Map a sort key to float64 with NaN for missing values, so dates and numbers rank alike."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        values = series.to_numpy(dtype='datetime64[ns]').view('int64').astype('float64')
+        values[series.isna().to_numpy()] = np.nan
+        return values
+    return series.to_numpy(dtype='float64', na_value=np.nan)
+
+
+def asof_join(left, right, on, by=None, direction='backward', tolerance=None):
+    """Attach to every left row the nearest right row by `on` (e.g. the last weather record before a harvest).
+
+    `by` columns must match exactly, `direction` is 'backward', 'forward' or 'nearest' and
+    `tolerance` limits the gap (a Timedelta string such as '7D' for dates). Both sides are
+    sorted once and matched in a single pass; left rows keep their original order.
+    """
+    by = list(by or [])
+    if by:
+        coerce_column_types(left, right, by)
+    if isinstance(tolerance, str):
+        tolerance = pd.Timedelta(tolerance)
+
+    # merge_asof needs identical key dtypes: float64 for numeric keys (an int column turns float
+    # as soon as it holds a NaN), datetime64[ns] for everything else
+    left_key, right_key = _as_sort_key(left[on]), _as_sort_key(right[on])
+    if pd.api.types.is_numeric_dtype(left_key) and pd.api.types.is_numeric_dtype(right_key):
+        left_key, right_key = left_key.astype('float64'), right_key.astype('float64')
+    else:
+        left_key = pd.to_datetime(left[on], errors='coerce').astype('datetime64[ns]')
+        right_key = pd.to_datetime(right[on], errors='coerce').astype('datetime64[ns]')
+
+    # Shared non-key columns get the _x/_y suffixes pd.merge would give them
+    overlap = (set(left.columns) & set(right.columns)) - {on} - set(by)
+    left_work = left.rename(columns={column: column + '_x' for column in overlap})
+    right_work = right.rename(columns={column: column + '_y' for column in overlap})
+    right_work = right_work.assign(**{on: right_key}).dropna(subset=[on]).sort_values(on, kind='mergesort')
+    right_columns = [column for column in right_work.columns if column != on and column not in by]
+
+    # Only the keys go through merge_asof; the matched right columns are then attached by row
+    # position, so rows without a key get the same columns, left empty
+    keys = pd.DataFrame({on: left_key.to_numpy(), '_ROW_ORDER': np.arange(len(left))})
+    for column in by:
+        keys[column] = left[column].to_numpy()
+    keys = keys.dropna(subset=[on]).sort_values(on, kind='mergesort')
+    matched = pd.merge_asof(keys, right_work, on=on, by=by or None, direction=direction, tolerance=tolerance)
+    attached = matched.set_index('_ROW_ORDER')[right_columns].reindex(np.arange(len(left)))
+
+    return pd.concat([left_work.reset_index(drop=True), attached.reset_index(drop=True)], axis=1)
+
+
+def interval_join(left, right, start, end, on, aggregations, by=None):
+    """Aggregate the right rows whose `on` lies within each left row's [start, end] window.
+
+    Typical use is summarising daily climate records over a growing season given by sowing
+    and harvest dates. `aggregations` maps right columns to one or more of count, sum, mean,
+    min and max; results are added to the left rows as `<COLUMN>_<AGG>`. The right table is
+    sorted once by (`by` group, `on`) and every window is located with a binary search, so
+    no left x right cross product is ever built.
+    """
+    by = list(by or [])
+    if by:
+        coerce_column_types(left, right, by)
+    for agg_list in aggregations.values():
+        for agg in [agg_list] if isinstance(agg_list, str) else agg_list:
+            if agg not in INTERVAL_AGGREGATIONS:
+                raise ValueError(f"Unsupported aggregation '{agg}', expected one of {INTERVAL_AGGREGATIONS}")
+
+    right_values = _as_float(_as_sort_key(right[on]))
+    right = right[~np.isnan(right_values)]
+    right_values = right_values[~np.isnan(right_values)]
+    starts = _as_float(_as_sort_key(left[start]))
+    ends = _as_float(_as_sort_key(left[end]))
+    has_window = ~np.isnan(starts) & ~np.isnan(ends)
+
+    # Give each `by` group a code shared by both sides
+    if by:
+        codes = pd.concat([left[by], right[by]], ignore_index=True).groupby(by, sort=False, dropna=False).ngroup()
+        codes = codes.to_numpy(dtype='int64')
+        left_codes, right_codes = codes[:len(left)], codes[len(left):]
+    else:
+        left_codes = np.zeros(len(left), dtype='int64')
+        right_codes = np.zeros(len(right), dtype='int64')
+
+    # Rank all positions on one axis and fold the group code in, so a single sorted int64
+    # array orders the right rows by (group, position) and windows map to contiguous slices
+    axis = np.unique(np.concatenate([right_values, starts[has_window], ends[has_window]]))
+    stride = len(axis) + 1
+    right_composite = right_codes * stride + np.searchsorted(axis, right_values)
+    order = np.argsort(right_composite, kind='stable')
+    right_composite = right_composite[order]
+
+    lo = np.zeros(len(left), dtype='int64')
+    hi = np.zeros(len(left), dtype='int64')
+    lo[has_window] = np.searchsorted(right_composite, left_codes[has_window] * stride
+                                     + np.searchsorted(axis, starts[has_window]), side='left')
+    hi[has_window] = np.searchsorted(right_composite, left_codes[has_window] * stride
+                                     + np.searchsorted(axis, ends[has_window]), side='right')
+    hi = np.maximum(hi, lo)
+    empty = hi == lo
+
+    merged_df = left.copy()
+    bounds = np.column_stack([lo, hi]).ravel()
+    for column, agg_list in aggregations.items():
+        values = pd.to_numeric(right[column], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)[order]
+        present = ~np.isnan(values)
+        cumulative_count = np.concatenate([[0], np.cumsum(present)])
+        cumulative_sum = np.concatenate([[0.0], np.cumsum(np.where(present, values, 0.0))])
+        count = cumulative_count[hi] - cumulative_count[lo]
+        total = cumulative_sum[hi] - cumulative_sum[lo]
+
+        for agg in [agg_list] if isinstance(agg_list, str) else agg_list:
+            if agg == 'count':
+                result = count.astype('float64')
+            elif agg == 'sum':
+                result = np.where(count > 0, total, np.nan)
+            elif agg == 'mean':
+                result = np.divide(total, count, out=np.full(len(left), np.nan), where=count > 0)
+            else:
+                # reduceat over interleaved [lo, hi) bounds reduces each window; the padding
+                # element keeps hi == len(values) a valid index
+                reducer = np.fmin if agg == 'min' else np.fmax
+                padded = np.append(values, np.nan)
+                result = reducer.reduceat(padded, bounds)[::2] if len(bounds) else np.array([])
+                result = np.where(empty | (count == 0), np.nan, result)
+            merged_df[f"{column}_{agg.upper()}"] = result
+
+    return merged_df
+
+
+class SeenRowHashes:
+    """Set of 64-bit row hashes kept as a few sorted NumPy runs.
+
+    New hashes are added as a sorted run and neighbouring runs of similar size are merged,
+    so membership tests stay a handful of binary searches and memory stays at 8 bytes per
+    row, which keeps chunk-wise deduplication of large files cheap.
+    """
+
+    def __init__(self):
+        self.runs = []
+
+    def __len__(self):
+        return sum(len(run) for run in self.runs)
+
+    def contains(self, hashes):
+        found = np.zeros(len(hashes), dtype=bool)
+        for run in self.runs:
+            positions = np.minimum(np.searchsorted(run, hashes), len(run) - 1)
+            found |= run[positions] == hashes
+        return found
+
+    def add(self, hashes):
+        if len(hashes) == 0:
+            return
+        self.runs.append(np.sort(hashes))
+        while len(self.runs) > 1 and len(self.runs[-2]) <= 2 * len(self.runs[-1]):
+            last = self.runs.pop()
+            self.runs[-1] = np.sort(np.concatenate([self.runs[-1], last]), kind='mergesort')
+
+
+def row_hashes(df, subset=None):
+    """Return one 64-bit hash per row over subset (all columns by default), independent of column order.
+
+    Numeric columns are hashed as float64, so a row read as int64 in one file and as float64
+    in a re-export (e.g. after the column gained a NaN) gets the same hash.
+    """
+    columns = sorted(subset or df.columns)
+    values = df[columns].copy()
+    for column in columns:
+        if pd.api.types.is_numeric_dtype(values[column]) and not pd.api.types.is_bool_dtype(values[column]):
+            values[column] = values[column].to_numpy(dtype='float64', na_value=np.nan)
+    return pd.util.hash_pandas_object(values, index=False).to_numpy(dtype='uint64')
+
+
+def _duplicate_mask(hashes, seen):
+    """Flag rows repeated within hashes and rows already in seen, then record the new ones."""
+    within = pd.Series(hashes).duplicated().to_numpy()
+    across = ~within & seen.contains(hashes)
+    seen.add(hashes[~(within | across)])
+    return within, across
+
+
+def deduplicate_dataframes(dataframes, subset=None, across_files=True):
+    """Drop repeated rows within each DataFrame and rows already present in an earlier one.
+
+    Rows are compared by 64-bit hash over subset (or all columns). Across files, only
+    DataFrames sharing the same hashed columns are compared, e.g. re-exports of one table or
+    overlapping yearly dumps; pass across_files=False to keep those rows, as an inner join
+    needs them in both files. The DataFrames are replaced in the dictionary; the returned
+    report maps each key to its within-file and across-file duplicate counts.
+    """
+    seen_by_columns = defaultdict(SeenRowHashes)
+    report = {}
+
+    for key, df in dataframes.items():
+        columns = subset or list(df.columns)
+        missing = set(columns) - set(df.columns)
+        if missing:
+            logging.warning(f"Skipping duplicate check for {key}: missing key columns {sorted(missing)}")
+            continue
+
+        hashes = row_hashes(df, columns)
+        seen = seen_by_columns[tuple(sorted(columns))] if across_files else SeenRowHashes()
+        within, across = _duplicate_mask(hashes, seen)
+        report[key] = {'within': int(within.sum()), 'across': int(across.sum())}
+        if report[key]['within'] or report[key]['across']:
+            dataframes[key] = df[~(within | across)]
+            logging.info(f"Removed {report[key]['within']} duplicate rows within {key} and "
+                         f"{report[key]['across']} rows already present in an earlier file.")
+
+    return report
+
+
+def drop_duplicate_rows(df, subset=None):
+    """Drop repeated rows from a single DataFrame (e.g. the final unified table) by row hash."""
+    duplicated = pd.Series(row_hashes(df, subset)).duplicated().to_numpy()
+    duplicate_count = int(duplicated.sum())
+    if duplicate_count:
+        logging.warning(f"Removed {duplicate_count} duplicate rows from the merged dataset.")
+    else:
+        logging.info("No duplicate rows found in the merged dataset.")
+    return df[~duplicated], duplicate_count
+
+
+def deduplicate_csv(input_path, output_path, subset=None, chunksize=500_000, seen=None):
+    """Copy a CSV to output_path without repeated rows, reading it chunk by chunk.
+
+    Values are compared as text, so files that do not fit in memory are handled with only
+    the 8-byte row hashes held in memory. Pass the same SeenRowHashes as seen to several
+    calls to also drop rows repeated across files. Returns (rows read, duplicates removed).
+    """
+    seen = seen if seen is not None else SeenRowHashes()
+    rows_read = 0
+    duplicate_count = 0
+
+    reader = pd.read_csv(input_path, dtype=str, keep_default_na=False, chunksize=chunksize)
+    for i, chunk in enumerate(reader):
+        within, across = _duplicate_mask(row_hashes(chunk, subset), seen)
+        duplicated = within | across
+        rows_read += len(chunk)
+        duplicate_count += int(duplicated.sum())
+        chunk[~duplicated].to_csv(output_path, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+
+    logging.info(f"Removed {duplicate_count} of {rows_read} rows from {input_path} as duplicates.")
+    return rows_read, duplicate_count
+
+
+def merge_dataframes(dataframes, start_key, merge_columns=None, how='outer', time_joins=None):
+    """Merge all DataFrames iteratively based on the most common columns.
+
+    `time_joins` maps DataFrame keys to as-of or interval join specs, for example
+    {'climate.csv': {'mode': 'asof', 'on': 'DATUM', 'by': ['STATION']}} or
+    {'climate.csv': {'mode': 'interval', 'on': 'DATUM', 'start': 'SAAT', 'end': 'ERNTE',
+    'aggregations': {'NIEDERSCHLAG': 'sum'}}}. These DataFrames are joined onto the result
+    after all exact-key merges, with the remaining spec entries passed to asof_join or
+    interval_join.
+    """
+    time_joins = time_joins or {}
+    time_frames = {key: dataframes.pop(key) for key in time_joins}
+    merged_df = dataframes.pop(start_key)
+    logging.info(f"Starting merge with {start_key}")
+
+    while dataframes:
+        best_match_key = None
+        best_common_columns = merge_columns if merge_columns else []
+        for key, df in dataframes.items():
+            common_columns = find_common_columns(merged_df, df)
+            if merge_columns:
+                common_columns = merge_columns
+            if len(common_columns) > len(best_common_columns):
+                best_match_key = key
+                best_common_columns = common_columns
+        if not best_common_columns:
+            raise ValueError("No common columns found for merging.")
+
+        logging.info(f"Merging with {best_match_key} on columns: {best_common_columns}")
+
+        # Coerce column types
+        coerce_column_types(merged_df, dataframes[best_match_key], best_common_columns)
+
+        # Perform the merge
+        try:
+            merged_df = pd.merge(merged_df, dataframes.pop(best_match_key), on=best_common_columns, how=how)
+        except MemoryError as e:
+            logging.error(f"MemoryError during merge: {e}")
+            return None
+
+    return apply_time_joins(merged_df, time_frames, time_joins)
+
+
+def apply_time_joins(merged_df, time_frames, time_joins):
+    """Attach each DataFrame in time_frames to merged_df with the as-of or interval join in time_joins."""
+    for key, spec in time_joins.items():
+        spec = dict(spec)
+        mode = spec.pop('mode')
+        logging.info(f"Joining {key} with {mode} join: {spec}")
+        if mode == 'asof':
+            merged_df = asof_join(merged_df, time_frames[key], **spec)
+        elif mode == 'interval':
+            merged_df = interval_join(merged_df, time_frames[key], **spec)
+        else:
+            raise ValueError(f"Unknown join mode '{mode}' for {key}, expected 'asof' or 'interval'.")
+
+    return merged_df
+
+
+def verify_merge(merged_df, original_dfs):
+    """Verify if the merged DataFrame contains all unique columns from the original DataFrames."""
+    unique_columns = set()
+    for df in original_dfs.values():
+        unique_columns.update(df.columns)
+
+    missing_columns = unique_columns - set(merged_df.columns)
+    if missing_columns:
+        logging.warning(f"Missing columns in the final merged dataset: {missing_columns}")
+    else:
+        logging.info("All unique columns are present in the final merged dataset.")
+
+    for key, original_df in original_dfs.items():
+        sample_row = original_df.iloc[0]
+        for column in sample_row.index:
+            if column in merged_df.columns:
+                merged_values = merged_df.loc[merged_df[column] == sample_row[column], column]
+                if not merged_values.empty and all(merged_values == sample_row[column]):
+                    logging.info(f"Column {column} from {key} is correctly merged.")
+                else:
+                    logging.warning(f"Discrepancy found in column {column} from {key}.")
+            else:
+                logging.warning(f"Column {column} from {key} is missing in the merged dataset.")
+
+
+def check_nan_rows_columns(df):
+    """Check for rows and columns that only contain NaN values, excluding the first row."""
+    # Check for rows that only contain NaNs, excluding the first row
+    nan_rows = df.iloc[1:][df.iloc[1:].isna().all(axis=1)]
+    if not nan_rows.empty:
+        print("Rows with all NaN values (excluding the first row):")
+        print(nan_rows)
+    else:
+        print("No rows with all NaN values found (excluding the first row).")
+
+    # Check for columns that only contain NaNs, excluding the first row
+    nan_columns = df.columns[df.iloc[1:].isna().all()]
+    if not nan_columns.empty:
+        print("Columns with all NaN values (excluding the first row):")
+        print(nan_columns)
+    else:
+        print("No columns with all NaN values found (excluding the first row).")
@@ -0,0 +1,197 @@
+import os
+import json
+import zlib
+import hashlib
+import logging
+from collections import Counter
+from datetime import datetime
+
+# Initialize logging
+logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+
+AVERAGE_CHUNK_SIZE = 1 << 20
+MIN_CHUNK_SIZE = AVERAGE_CHUNK_SIZE // 4
+MAX_CHUNK_SIZE = AVERAGE_CHUNK_SIZE * 4
+
+
+def iter_chunks(f, average_size=AVERAGE_CHUNK_SIZE, min_size=MIN_CHUNK_SIZE, max_size=MAX_CHUNK_SIZE):
+    """Split a binary file into content-defined chunks that always end on a line break.
+
+    A line closes the current chunk when its CRC32 falls below a threshold proportional to
+    the line length, so chunks average about average_size bytes and the boundaries depend
+    only on nearby content: inserting or removing rows changes the chunks around the edit
+    and the boundaries after it fall back into place. Yields (offset, bytes) pairs.
+    """
+    offset = 0
+    lines = []
+    size = 0
+    for line in f:
+        lines.append(line)
+        size += len(line)
+        at_boundary = zlib.crc32(line) < (1 << 32) * len(line) / average_size
+        if size >= max_size or (size >= min_size and at_boundary):
+            yield offset, b''.join(lines)
+            offset += size
+            lines = []
+            size = 0
+    if lines:
+        yield offset, b''.join(lines)
+
+
+def _chunk_path(store_dir, chunk_id):
+    return os.path.join(store_dir, 'chunks', chunk_id[:2], chunk_id + '.zlib')
+
+
+def _manifest_path(store_dir, version):
+    return os.path.join(store_dir, 'manifests', version + '.json')
+
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = path + '.part'
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+
+def _read_chunk(store_dir, chunk_id):
+    with open(_chunk_path(store_dir, chunk_id), 'rb') as f:
+        return zlib.decompress(f.read())
+
+
+def _store_file(store_dir, file_path):
+    """Chunk a file into the store, writing only chunks not stored before."""
+    chunk_ids = []
+    new_chunks = 0
+    new_bytes = 0
+    file_hash = hashlib.sha256()
+    size = 0
+    with open(file_path, 'rb') as f:
+        for _, data in iter_chunks(f):
+            chunk_id = hashlib.sha256(data).hexdigest()
+            if not os.path.exists(_chunk_path(store_dir, chunk_id)):
+                _write_atomic(_chunk_path(store_dir, chunk_id), zlib.compress(data, 1))
+                new_chunks += 1
+                new_bytes += len(data)
+            chunk_ids.append(chunk_id)
+            file_hash.update(data)
+            size += len(data)
+    entry = {'size': size, 'sha256': file_hash.hexdigest(), 'chunks': chunk_ids}
+    return entry, new_chunks, new_bytes
+
+
+def commit_snapshot(store_dir, file_path, label=None):
+    """Store a new version of file_path (and its .index.json sidecar, if present) and return the version id."""
+    version = datetime.now().strftime('%Y%m%dT%H%M%S%f')
+    manifest = {'version': version, 'label': label, 'source': os.path.abspath(file_path), 'files': {}}
+
+    for path in [file_path, file_path + '.index.json']:
+        if not os.path.exists(path):
+            continue
+        entry, new_chunks, new_bytes = _store_file(store_dir, path)
+        manifest['files'][os.path.basename(path)] = entry
+        logging.info(f"Stored {os.path.basename(path)}: {len(entry['chunks'])} chunks, {new_chunks} new "
+                     f"({new_bytes} of {entry['size']} bytes written)")
+
+    _write_atomic(_manifest_path(store_dir, version), json.dumps(manifest, indent=2).encode('utf-8'))
+    logging.info(f"Committed snapshot {version} of '{file_path}'")
+    return version
+
+
+def load_manifest(store_dir, version):
+    with open(_manifest_path(store_dir, version), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def list_versions(store_dir):
+    """Return (version, label, total size) for every stored snapshot, oldest first."""
+    manifest_dir = os.path.join(store_dir, 'manifests')
+    if not os.path.isdir(manifest_dir):
+        return []
+    versions = []
+    for filename in sorted(os.listdir(manifest_dir)):
+        if filename.endswith('.json'):
+            manifest = load_manifest(store_dir, filename[:-len('.json')])
+            size = sum(entry['size'] for entry in manifest['files'].values())
+            versions.append((manifest['version'], manifest['label'], size))
+    return versions
+
+
+def diff_versions(store_dir, old_version, new_version, file_name=None):
+    """Compare the main file of two snapshots and return the rows removed and added.
+
+    Chunks shared by both versions hold identical rows and are never read; only chunks
+    unique to one side are decompressed, and their lines are compared as multisets.
+    """
+    old_manifest = load_manifest(store_dir, old_version)
+    new_manifest = load_manifest(store_dir, new_version)
+    file_name = file_name or next(iter(new_manifest['files']))
+    old_chunks = old_manifest['files'].get(file_name, {'chunks': []})['chunks']
+    new_chunks = new_manifest['files'].get(file_name, {'chunks': []})['chunks']
+
+    old_only = Counter(old_chunks) - Counter(new_chunks)
+    new_only = Counter(new_chunks) - Counter(old_chunks)
+    old_lines = Counter()
+    new_lines = Counter()
+    for chunk_id, count in old_only.items():
+        for line in _read_chunk(store_dir, chunk_id).splitlines():
+            old_lines[line] += count
+    for chunk_id, count in new_only.items():
+        for line in _read_chunk(store_dir, chunk_id).splitlines():
+            new_lines[line] += count
+
+    removed = list((old_lines - new_lines).elements())
+    added = list((new_lines - old_lines).elements())
+    logging.info(f"{file_name} {old_version} -> {new_version}: {sum(old_only.values())} chunks removed, "
+                 f"{sum(new_only.values())} chunks added, {len(removed)} rows removed, {len(added)} rows added")
+    return {
+        'chunks_removed': sum(old_only.values()),
+        'chunks_added': sum(new_only.values()),
+        'rows_removed': [line.decode('utf-8') for line in removed],
+        'rows_added': [line.decode('utf-8') for line in added],
+    }
+
+
+def restore_snapshot(store_dir, version, output_dir):
+    """Write the files of a snapshot into output_dir.
+
+    If a file of the same name already exists there, chunks it already contains are copied
+    from it and only the missing chunks are read from the store.
+    """
+    manifest = load_manifest(store_dir, version)
+    os.makedirs(output_dir, exist_ok=True)
+
+    for file_name, entry in manifest['files'].items():
+        output_path = os.path.join(output_dir, file_name)
+        local_chunks = {}
+        if os.path.exists(output_path):
+            with open(output_path, 'rb') as f:
+                for offset, data in iter_chunks(f):
+                    local_chunks[hashlib.sha256(data).hexdigest()] = (offset, len(data))
+
+        fetched = 0
+        file_hash = hashlib.sha256()
+        temp_path = output_path + '.part'
+        with open(temp_path, 'wb') as out:
+            local_file = open(output_path, 'rb') if local_chunks else None
+            try:
+                for chunk_id in entry['chunks']:
+                    if chunk_id in local_chunks:
+                        offset, length = local_chunks[chunk_id]
+                        local_file.seek(offset)
+                        data = local_file.read(length)
+                    else:
+                        data = _read_chunk(store_dir, chunk_id)
+                        fetched += 1
+                    out.write(data)
+                    file_hash.update(data)
+            finally:
+                if local_file:
+                    local_file.close()
+
+        if file_hash.hexdigest() != entry['sha256']:
+            os.remove(temp_path)
+            raise ValueError(f"Restored {file_name} does not match the checksum stored in snapshot {version}.")
+        os.replace(temp_path, output_path)
+        logging.info(f"Restored {file_name} from snapshot {version}: {fetched} of {len(entry['chunks'])} "
+                     f"chunks read from the store")
@@ -42,9 +42,11 @@ def tei_to_json(tei_file_path, json_file_path):
     with open(json_file_path, 'w', encoding='utf-8') as json_file:
         json_file.write(json_content)
 
-# Example usage
-pdf_folder_path = '/home/max/Desktop/Hiwi_Job/RAG_database/PDF_files'
-tei_folder_path = '/home/max/Desktop/Hiwi_Job/RAG_database/TEI_files'
-json_folder_path = '/home/max/Desktop/Hiwi_Job/RAG_database/JSON_files'
+if __name__ == "__main__":
+    # Example usage
+    pdf_folder_path = '/home/max/Desktop/Hiwi_Job/RAG_database/PDF_files'
+    tei_folder_path = '/home/max/Desktop/Hiwi_Job/RAG_database/TEI_files'
+    json_folder_path = '/home/max/Desktop/Hiwi_Job/RAG_database/JSON_files'
+
+    process_pdfs(pdf_folder_path, tei_folder_path, json_folder_path)
 
-process_pdfs(pdf_folder_path, tei_folder_path, json_folder_path)
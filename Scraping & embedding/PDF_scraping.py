@@ -1,4 +1,142 @@
 from bs4 import BeautifulSoup
 import scrapy
 from scrapy.crawler import CrawlerProcess
+import os
+import re
+import hashlib
+import sqlite3
+from urllib.parse import urldefrag, urlparse, unquote
 
+
+class CrawlState:
+    """Persisted record of downloaded URLs and PDF content hashes, shared across crawl runs."""
+
+    def __init__(self, state_dir):
+        os.makedirs(state_dir, exist_ok=True)
+        self.connection = sqlite3.connect(os.path.join(state_dir, 'crawl_state.sqlite'))
+        self.connection.execute("CREATE TABLE IF NOT EXISTS downloaded_urls (url TEXT PRIMARY KEY, sha256 TEXT)")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS pdf_hashes (sha256 TEXT PRIMARY KEY, filename TEXT)")
+        self.connection.commit()
+
+    def is_downloaded(self, url):
+        return self.connection.execute("SELECT 1 FROM downloaded_urls WHERE url = ?", (url,)).fetchone() is not None
+
+    def filename_for_hash(self, sha256):
+        row = self.connection.execute("SELECT filename FROM pdf_hashes WHERE sha256 = ?", (sha256,)).fetchone()
+        return row[0] if row else None
+
+    def record(self, url, sha256, filename=None):
+        if filename is not None:
+            self.connection.execute("INSERT OR IGNORE INTO pdf_hashes VALUES (?, ?)", (sha256, filename))
+        self.connection.execute("INSERT OR REPLACE INTO downloaded_urls VALUES (?, ?)", (url, sha256))
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+
+def pdf_filename_from_url(url):
+    """Derive a filesystem-safe PDF filename from the last path segment of a URL."""
+    name = os.path.basename(unquote(urlparse(url).path)) or 'document'
+    name = re.sub(r'[^A-Za-z0-9._-]+', '_', name)
+    if not name.lower().endswith('.pdf'):
+        name += '.pdf'
+    return name
+
+
+class PDFSpider(scrapy.Spider):
+    """Follow HTML links from the start pages and store every PDF found exactly once."""
+
+    name = 'pdf_spider'
+
+    def __init__(self, start_urls, output_dir, state_dir, allowed_domains=None, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.start_urls = start_urls
+        self.allowed_domains = allowed_domains or sorted({urlparse(url).hostname for url in start_urls})
+        self.output_dir = output_dir
+        self.crawl_state = CrawlState(state_dir)
+        os.makedirs(output_dir, exist_ok=True)
+
+    def start_requests(self):
+        for url in self.start_urls:
+            if not self.crawl_state.is_downloaded(url):
+                yield scrapy.Request(url, callback=self.parse, dont_filter=True)
+
+    def parse(self, response):
+        if self.is_pdf(response):
+            self.save_pdf(response)
+            return
+
+        if not isinstance(response, scrapy.http.TextResponse):
+            return
+
+        soup = BeautifulSoup(response.text, 'html.parser')
+        for link in soup.find_all('a', href=True):
+            url = urldefrag(response.urljoin(link['href'])).url
+            if url.startswith(('http://', 'https://')) and not self.crawl_state.is_downloaded(url):
+                yield scrapy.Request(url, callback=self.parse)
+
+    @staticmethod
+    def is_pdf(response):
+        content_type = response.headers.get('Content-Type', b'').decode('latin-1').lower()
+        return 'application/pdf' in content_type or response.body[:5] == b'%PDF-'
+
+    def save_pdf(self, response):
+        sha256 = hashlib.sha256(response.body).hexdigest()
+        existing = self.crawl_state.filename_for_hash(sha256)
+        if existing:
+            self.logger.info(f"Skipping {response.url}: same content as {existing}")
+            self.crawl_state.record(response.url, sha256)
+            return
+
+        filename = pdf_filename_from_url(response.url)
+        if os.path.exists(os.path.join(self.output_dir, filename)):
+            filename = f"{sha256[:8]}_{filename}"
+        file_path = os.path.join(self.output_dir, filename)
+
+        # Write to a temporary file first so an interrupted crawl never leaves a truncated PDF behind
+        temp_path = file_path + '.part'
+        with open(temp_path, 'wb') as f:
+            f.write(response.body)
+        os.replace(temp_path, file_path)
+
+        self.crawl_state.record(response.url, sha256, filename)
+        self.logger.info(f"Saved {response.url} to {file_path}")
+
+    def closed(self, reason):
+        self.crawl_state.close()
+
+
+def run_crawler(start_urls, output_dir, state_dir, allowed_domains=None, concurrent_requests=16,
+                per_host_concurrency=2, download_delay=0.5, depth_limit=3, obey_robots_txt=True):
+    """Crawl start_urls for PDFs and write them into output_dir.
+
+    The Scrapy request queue and seen-request fingerprints are persisted in state_dir/jobdir,
+    so an interrupted crawl resumes where it stopped when run again with the same state_dir.
+    Delete state_dir/jobdir to revisit known pages; the URL and content-hash records in
+    crawl_state.sqlite still keep already downloaded PDFs from being fetched or stored twice.
+    """
+    process = CrawlerProcess(settings={
+        'CONCURRENT_REQUESTS': concurrent_requests,
+        'CONCURRENT_REQUESTS_PER_DOMAIN': per_host_concurrency,
+        'DOWNLOAD_DELAY': download_delay,
+        'AUTOTHROTTLE_ENABLED': True,
+        'AUTOTHROTTLE_START_DELAY': download_delay,
+        'AUTOTHROTTLE_TARGET_CONCURRENCY': per_host_concurrency,
+        'ROBOTSTXT_OBEY': obey_robots_txt,
+        'DEPTH_LIMIT': depth_limit,
+        'JOBDIR': os.path.join(state_dir, 'jobdir'),
+        'LOG_LEVEL': 'INFO',
+    })
+    process.crawl(PDFSpider, start_urls=start_urls, output_dir=output_dir, state_dir=state_dir,
+                  allowed_domains=allowed_domains)
+    process.start()
+
+
+if __name__ == "__main__":
+    # Example usage
+    start_urls = ['https://example.org/publications']  # INSERT YOUR START PAGES HERE
+    pdf_folder_path = '/home/max/Desktop/Hiwi_Job/RAG_database/PDF_files'
+    state_dir = '/home/max/Desktop/Hiwi_Job/RAG_database/crawl_state'
+
+    run_crawler(start_urls, pdf_folder_path, state_dir)
@@ -0,0 +1,99 @@
+import os
+import sys
+import hashlib
+import logging
+import tempfile
+import subprocess
+from http.server import SimpleHTTPRequestHandler
+from stub_servers import start_stub_server
+
+# Initialize logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'crawl_fixtures')
+
+
+class FixtureHandler(SimpleHTTPRequestHandler):
+    """Serve the fixture site and remember every requested path."""
+
+    protocol_version = 'HTTP/1.1'
+    fixture_dir = FIXTURE_DIR
+    requested_paths = []
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, directory=self.fixture_dir, **kwargs)
+
+    def do_GET(self):
+        self.requested_paths.append(self.path)
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        logging.debug(f"Fixture site: {format % args}")
+
+
+def pdf_hashes(directory):
+    """Return the SHA-256 of every PDF below directory."""
+    hashes = []
+    for root, _, filenames in os.walk(directory):
+        for filename in filenames:
+            if filename.endswith('.pdf'):
+                with open(os.path.join(root, filename), 'rb') as f:
+                    hashes.append(hashlib.sha256(f.read()).hexdigest())
+    return hashes
+
+
+def crawl_once(start_url, output_dir, state_dir):
+    """Run one crawl in a fresh interpreter, as Scrapy's reactor cannot be started twice in one process."""
+    code = (f"from PDF_scraping import run_crawler; "
+            f"run_crawler({[start_url]!r}, {output_dir!r}, {state_dir!r}, download_delay=0, obey_robots_txt=False)")
+    subprocess.run([sys.executable, '-c', code], cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+
+
+def run_checks(work_dir, fixture_dir=FIXTURE_DIR):
+    """Crawl the fixture site twice and return a list of failed expectations (empty if all hold).
+
+    The first run must store each distinct PDF once, skipping the mirror copy with identical
+    content, and the second run with the same state_dir must not request any PDF again.
+    """
+    handler = type('FixtureSiteHandler', (FixtureHandler,), {'fixture_dir': fixture_dir, 'requested_paths': []})
+    server, url = start_stub_server(handler)
+    output_dir = os.path.join(work_dir, 'PDF_files')
+    state_dir = os.path.join(work_dir, 'crawl_state')
+    failures = []
+
+    try:
+        crawl_once(f"{url}/index.html", output_dir, state_dir)
+        first_run = [path for path in handler.requested_paths if path.endswith('.pdf')]
+        stored = sorted(os.listdir(output_dir))
+        logging.info(f"First run requested {len(first_run)} PDFs and stored {stored}")
+        expected = set(pdf_hashes(fixture_dir))
+        stored_hashes = pdf_hashes(output_dir)
+        if len(stored_hashes) != len(set(stored_hashes)):
+            failures.append(f"First run stored the same content more than once: {stored}")
+        if set(stored_hashes) != expected:
+            failures.append(f"First run stored {len(set(stored_hashes))} distinct PDFs, expected {len(expected)}")
+        if len(first_run) <= len(expected):
+            failures.append("First run never requested a duplicate PDF, so content deduplication was not exercised")
+
+        handler.requested_paths.clear()
+        crawl_once(f"{url}/index.html", output_dir, state_dir)
+        second_run = [path for path in handler.requested_paths if path.endswith('.pdf')]
+        logging.info(f"Second run requested {len(second_run)} PDFs")
+        if second_run:
+            failures.append(f"Second run fetched PDFs again: {second_run}")
+        if sorted(os.listdir(output_dir)) != stored:
+            failures.append(f"Second run changed the stored PDFs to {sorted(os.listdir(output_dir))}")
+    finally:
+        server.shutdown()
+
+    return failures
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as work_dir:
+        failures = run_checks(work_dir)
+    for failure in failures:
+        logging.error(failure)
+    if failures:
+        sys.exit(1)
+    logging.info("Crawler check passed.")
@@ -0,0 +1,111 @@
+import os
+import time
+import logging
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from grobid_client_custom import GrobidClient
+from stub_servers import make_grobid_handler, start_stub_server
+
+# Initialize logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logging.getLogger('httpx').setLevel(logging.WARNING)
+
+
+def make_sample_pdfs(directory, count, size_bytes=200_000):
+    """Write count dummy PDFs of roughly size_bytes each and return their paths."""
+    os.makedirs(directory, exist_ok=True)
+    pdf_paths = []
+    for i in range(count):
+        pdf_path = os.path.join(directory, f"sample_{i:04d}.pdf")
+        with open(pdf_path, 'wb') as f:
+            f.write(b'%PDF-1.4\n' + os.urandom(size_bytes))
+        pdf_paths.append(pdf_path)
+    return pdf_paths
+
+
+def percentile(sorted_values, q):
+    """Return the q-th percentile (0-100) of an already sorted list, interpolating linearly."""
+    if not sorted_values:
+        return float('nan')
+    position = (len(sorted_values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def run_benchmark(host, pdf_paths, concurrency, pool_size, output_dir, max_retries=5, retry_delay=0.2):
+    """Send every PDF through GrobidClient with the given thread and connection pool sizes."""
+    client = GrobidClient(host=host, max_connections=pool_size, max_retries=max_retries, retry_delay=retry_delay)
+    latencies = []
+    errors = 0
+
+    def process_one(pdf_path):
+        output = os.path.join(output_dir, os.path.basename(pdf_path).replace('.pdf', '.tei.xml'))
+        start = time.perf_counter()
+        try:
+            client.process("processFulltextDocument", pdf_path, output=output)
+        except Exception as e:
+            logging.debug(f"Failed to process {pdf_path}: {e}")
+            return None
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for latency in executor.map(process_one, pdf_paths):
+            if latency is None:
+                errors += 1
+            else:
+                latencies.append(latency)
+    wall_seconds = time.perf_counter() - start
+    client.close()
+
+    latencies.sort()
+    return {
+        'concurrency': concurrency,
+        'pool_size': pool_size,
+        'pdfs': len(pdf_paths),
+        'pdfs_per_sec': len(latencies) / wall_seconds,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p90_ms': percentile(latencies, 90) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'error_rate': errors / len(pdf_paths),
+        'busy_responses': client.busy_responses,
+    }
+
+
+def sweep(host, pdf_paths, concurrencies, pool_sizes, **benchmark_options):
+    """Benchmark every combination of client concurrency and connection pool size."""
+    results = []
+    with tempfile.TemporaryDirectory() as output_dir:
+        for concurrency in concurrencies:
+            for pool_size in pool_sizes:
+                result = run_benchmark(host, pdf_paths, concurrency, pool_size, output_dir, **benchmark_options)
+                logging.info(f"concurrency={concurrency} pool={pool_size}: {result['pdfs_per_sec']:.1f} PDFs/s, "
+                             f"p50 {result['p50_ms']:.0f} ms, p99 {result['p99_ms']:.0f} ms, "
+                             f"errors {result['error_rate']:.1%}, 503s {result['busy_responses']}")
+                results.append(result)
+    return results
+
+
+def print_report(results):
+    """Print the sweep results as a fixed-width table."""
+    header = f"{'conc':>5} {'pool':>5} {'PDFs/s':>8} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'errors':>7} {'503s':>6}"
+    print(header)
+    print('-' * len(header))
+    for r in results:
+        print(f"{r['concurrency']:>5} {r['pool_size']:>5} {r['pdfs_per_sec']:>8.1f} {r['p50_ms']:>8.0f} "
+              f"{r['p90_ms']:>8.0f} {r['p99_ms']:>8.0f} {r['error_rate']:>7.1%} {r['busy_responses']:>6}")
+
+
+if __name__ == "__main__":
+    # Example usage: imitate a GROBID instance with 8 worker slots and ~300 ms per document.
+    # Set grobid_host to a real deployment (e.g. 'http://localhost:8070') to measure it instead.
+    handler = make_grobid_handler(latency=0.3, latency_jitter=0.1, busy_rate=0.01, max_concurrent=8,
+                                  payload_bytes=50_000)
+    server, grobid_host = start_stub_server(handler)
+
+    with tempfile.TemporaryDirectory() as pdf_dir:
+        pdf_paths = make_sample_pdfs(pdf_dir, count=100)
+        results = sweep(grobid_host, pdf_paths, concurrencies=[1, 4, 8, 16], pool_sizes=[4, 8, 16])
+    print_report(results)
+    server.shutdown()
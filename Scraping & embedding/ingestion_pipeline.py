@@ -0,0 +1,271 @@
+import os
+import json
+import queue
+import threading
+import time
+import logging
+import httpx
+from xml.etree import ElementTree
+from dotenv import load_dotenv
+from grobid_client_custom import GrobidClient
+from PDF_TEI_JSON_pipeline import tei_to_json
+
+# Initialize logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Marks the end of the stream on a stage's input queue
+_STOP = object()
+
+
+class Stage:
+    """A named pipeline step executed by a pool of worker threads fed from a bounded queue."""
+
+    def __init__(self, name, func, workers=1, queue_size=8):
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.queue_size = queue_size
+
+
+class StageMetrics:
+    """Counters collected for one stage while the pipeline runs."""
+
+    def __init__(self, name, workers):
+        self.name = name
+        self.workers = workers
+        self.processed = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.queue_samples = []
+        self.lock = threading.Lock()
+
+    def record(self, seconds, failed=False):
+        with self.lock:
+            self.busy_seconds += seconds
+            if failed:
+                self.errors += 1
+            else:
+                self.processed += 1
+
+    def summary(self, wall_seconds):
+        """Return throughput, utilisation and queue depth figures for the stage."""
+        samples = self.queue_samples or [0]
+        return {
+            'stage': self.name,
+            'workers': self.workers,
+            'processed': self.processed,
+            'errors': self.errors,
+            'items_per_sec': self.processed / wall_seconds if wall_seconds else 0.0,
+            'utilisation': self.busy_seconds / (wall_seconds * self.workers) if wall_seconds else 0.0,
+            'queue_depth_mean': sum(samples) / len(samples),
+            'queue_depth_max': max(samples),
+        }
+
+
+class IngestionPipeline:
+    """Run items through a chain of stages concurrently, with backpressure between stages.
+
+    Every stage owns a bounded input queue. Producers block once the queue of the next
+    stage is full, so a slow stage throttles everything upstream instead of letting
+    intermediate results pile up in memory. Stage functions take one item and return the
+    item for the next stage, or None to drop it.
+    """
+
+    def __init__(self, stages, sample_interval=0.1):
+        self.stages = stages
+        self.sample_interval = sample_interval
+        self.queues = [queue.Queue(maxsize=stage.queue_size) for stage in stages]
+        self.metrics = [StageMetrics(stage.name, stage.workers) for stage in stages]
+        self.results = []
+        self._alive = [stage.workers for stage in stages]
+        self._alive_lock = threading.Lock()
+
+    def _worker(self, index):
+        stage = self.stages[index]
+        metrics = self.metrics[index]
+        inbox = self.queues[index]
+        outbox = self.queues[index + 1] if index + 1 < len(self.stages) else None
+
+        while True:
+            item = inbox.get()
+            if item is _STOP:
+                break
+            start = time.perf_counter()
+            try:
+                result = stage.func(item)
+            except Exception as e:
+                metrics.record(time.perf_counter() - start, failed=True)
+                logging.error(f"Stage {stage.name} failed: {e}")
+                continue
+            metrics.record(time.perf_counter() - start)
+
+            if result is None:
+                continue
+            if outbox is not None:
+                outbox.put(result)
+            else:
+                self.results.append(result)
+
+        # The last worker of a stage to finish closes the next stage
+        with self._alive_lock:
+            self._alive[index] -= 1
+            last_worker = self._alive[index] == 0
+        if last_worker and outbox is not None:
+            for _ in range(self.stages[index + 1].workers):
+                outbox.put(_STOP)
+
+    def _sample_queues(self, done):
+        while not done.wait(self.sample_interval):
+            for q, metrics in zip(self.queues, self.metrics):
+                metrics.queue_samples.append(q.qsize())
+
+    def run(self, items):
+        """Feed all items through the pipeline and return (results, per-stage metrics)."""
+        threads = []
+        for index, stage in enumerate(self.stages):
+            for n in range(stage.workers):
+                thread = threading.Thread(target=self._worker, args=(index,), name=f"{stage.name}-{n}", daemon=True)
+                thread.start()
+                threads.append(thread)
+
+        done = threading.Event()
+        sampler = threading.Thread(target=self._sample_queues, args=(done,), daemon=True)
+        sampler.start()
+
+        start = time.perf_counter()
+        for item in items:
+            self.queues[0].put(item)
+        for _ in range(self.stages[0].workers):
+            self.queues[0].put(_STOP)
+
+        for thread in threads:
+            thread.join()
+        wall_seconds = time.perf_counter() - start
+        done.set()
+        sampler.join()
+
+        summaries = [metrics.summary(wall_seconds) for metrics in self.metrics]
+        for summary in summaries:
+            logging.info(f"Stage {summary['stage']}: {summary['processed']} processed, {summary['errors']} errors, "
+                         f"{summary['items_per_sec']:.2f} items/s, utilisation {summary['utilisation']:.0%}, "
+                         f"queue depth mean {summary['queue_depth_mean']:.1f} / max {summary['queue_depth_max']}")
+        logging.info(f"Pipeline finished {len(self.results)} items in {wall_seconds:.2f}s")
+        return self.results, summaries
+
+
+def extract_paragraphs(element):
+    """Collect the full text of all <p> elements in a TEI tree, including inline <ref>, <hi> and <s> children."""
+    paragraphs = []
+    for child in element:
+        if child.tag.rsplit('}', 1)[-1] == 'p':
+            text = ' '.join(''.join(child.itertext()).split())
+            if text:
+                paragraphs.append(text)
+        else:
+            paragraphs.extend(extract_paragraphs(child))
+    return paragraphs
+
+
+def chunk_text(text, chunk_size=200, overlap=40):
+    """Split text into overlapping windows of chunk_size words."""
+    words = text.split()
+    if not words:
+        return []
+    step = max(chunk_size - overlap, 1)
+    return [' '.join(words[i:i + chunk_size]) for i in range(0, max(len(words) - overlap, 1), step)]
+
+
+def build_pdf_pipeline(tei_folder_path, json_folder_path, index_file_path,
+                       grobid_host="http://localhost:8070", embedding_url='https://api.openai.com/v1/embeddings',
+                       embedding_model="text-embedding-3-small", api_key=None,
+                       grobid_workers=4, parse_workers=2, chunk_workers=2, embed_workers=4, index_workers=1,
+                       queue_size=8, chunk_size=200, overlap=40, embedding_batch_size=64):
+    """Build the PDF -> GROBID -> TEI parse -> chunk -> embed -> index pipeline.
+
+    GROBID and the embedding API are network-bound and get the largest worker pools;
+    they overlap with the CPU-bound parsing, chunking and indexing stages. Returns the
+    pipeline and the HTTP clients it uses, which the caller closes after the run.
+    """
+    os.makedirs(tei_folder_path, exist_ok=True)
+    os.makedirs(json_folder_path, exist_ok=True)
+
+    grobid_client = GrobidClient(host=grobid_host, max_connections=grobid_workers)
+    embedding_client = httpx.Client(timeout=60)
+    headers = {
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {api_key}"
+    }
+    index_lock = threading.Lock()
+
+    def grobid_stage(doc):
+        doc['tei_path'] = os.path.join(tei_folder_path, doc['name'] + '.tei.xml')
+        grobid_client.process("processFulltextDocument", doc['pdf_path'], output=doc['tei_path'])
+        return doc
+
+    def parse_stage(doc):
+        json_path = os.path.join(json_folder_path, doc['name'] + '.json')
+        tei_to_json(doc['tei_path'], json_path)
+        # xmltodict separates a paragraph's text from its inline children, so the text is read
+        # in document order from the element tree instead
+        doc['text'] = '\n'.join(extract_paragraphs(ElementTree.parse(doc['tei_path']).getroot()))
+        return doc
+
+    def chunk_stage(doc):
+        doc['chunks'] = chunk_text(doc.pop('text'), chunk_size, overlap)
+        return doc
+
+    def embed_stage(doc):
+        doc['embeddings'] = []
+        for i in range(0, len(doc['chunks']), embedding_batch_size):
+            data = {"input": doc['chunks'][i:i + embedding_batch_size], "model": embedding_model}
+            response = embedding_client.post(embedding_url, headers=headers, content=json.dumps(data))
+            response.raise_for_status()
+            doc['embeddings'].extend(item['embedding'] for item in response.json()['data'])
+        return doc
+
+    def index_stage(doc):
+        with index_lock, open(index_file_path, 'a', encoding='utf-8') as index_file:
+            for i, (chunk, embedding) in enumerate(zip(doc['chunks'], doc['embeddings'])):
+                record = {"document": doc['name'], "chunk": i, "text": chunk, "embedding": embedding}
+                index_file.write(json.dumps(record) + '\n')
+        return {"document": doc['name'], "chunks": len(doc['chunks'])}
+
+    stages = [
+        Stage("grobid", grobid_stage, workers=grobid_workers, queue_size=queue_size),
+        Stage("tei_parse", parse_stage, workers=parse_workers, queue_size=queue_size),
+        Stage("chunk", chunk_stage, workers=chunk_workers, queue_size=queue_size),
+        Stage("embed", embed_stage, workers=embed_workers, queue_size=queue_size),
+        Stage("index", index_stage, workers=index_workers, queue_size=queue_size),
+    ]
+    return IngestionPipeline(stages), [grobid_client, embedding_client]
+
+
+def ingest_pdfs(pdf_folder_path, tei_folder_path, json_folder_path, index_file_path, **pipeline_options):
+    """Run every PDF in pdf_folder_path through the staged ingestion pipeline."""
+    pipeline, clients = build_pdf_pipeline(tei_folder_path, json_folder_path, index_file_path, **pipeline_options)
+    documents = (
+        {"name": pdf_filename[:-len('.pdf')], "pdf_path": os.path.join(pdf_folder_path, pdf_filename)}
+        for pdf_filename in sorted(os.listdir(pdf_folder_path))
+        if pdf_filename.endswith('.pdf')
+    )
+    try:
+        return pipeline.run(documents)
+    finally:
+        for client in clients:
+            client.close()
+
+
+if __name__ == "__main__":
+    # Load environment variables from the .env file
+    load_dotenv()
+
+    # Example usage
+    pdf_folder_path = '/home/max/Desktop/Hiwi_Job/RAG_database/PDF_files'
+    tei_folder_path = '/home/max/Desktop/Hiwi_Job/RAG_database/TEI_files'
+    json_folder_path = '/home/max/Desktop/Hiwi_Job/RAG_database/JSON_files'
+    index_file_path = '/home/max/Desktop/Hiwi_Job/RAG_database/embedding_index.jsonl'
+
+    # To run against local stand-ins, start stub_servers.py and pass
+    # grobid_host='http://127.0.0.1:8070', embedding_url='http://127.0.0.1:8071/v1/embeddings'
+    ingest_pdfs(pdf_folder_path, tei_folder_path, json_folder_path, index_file_path,
+                api_key=os.getenv("OPENAI_API_KEY"))
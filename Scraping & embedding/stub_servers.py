@@ -0,0 +1,170 @@
+import hashlib
+import json
+import logging
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Initialize logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+TEI_TEMPLATE = """<?xml version="1.0" encoding="UTF-8"?>
+<TEI xmlns="http://www.tei-c.org/ns/1.0">
+    <teiHeader>
+        <fileDesc>
+            <titleStmt>
+                <title level="a" type="main">Stub document {digest}</title>
+            </titleStmt>
+        </fileDesc>
+    </teiHeader>
+    <text>
+        <body>
+            <div>
+                <head>Introduction</head>
+                <p>{paragraph}</p>
+            </div>
+            <div>
+                <head>Results</head>
+                <p>{paragraph}</p>
+            </div>
+        </body>
+    </text>
+</TEI>
+"""
+
+
+class StubGrobidHandler(BaseHTTPRequestHandler):
+    """Answer /api/processFulltextDocument with a small TEI document derived from the upload.
+
+    The class attributes control how closely the stub imitates a loaded GROBID instance;
+    use make_grobid_handler to get a configured subclass.
+    """
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    latency = 0.0
+    latency_jitter = 0.0
+    busy_rate = 0.0
+    max_concurrent = None
+    payload_bytes = None
+    active_requests = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if not self.path.startswith('/api/processFulltextDocument'):
+            self.send_error(404)
+            return
+
+        cls = type(self)
+        with cls.lock:
+            # Like GROBID, refuse work with 503 once every worker slot is taken
+            busy = (cls.max_concurrent is not None and cls.active_requests >= cls.max_concurrent) \
+                or random.random() < cls.busy_rate
+            if not busy:
+                cls.active_requests += 1
+        if busy:
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        try:
+            time.sleep(max(0.0, random.gauss(cls.latency, cls.latency_jitter)))
+            digest = hashlib.sha256(body).hexdigest()[:12]
+            paragraph = ' '.join(f"Sentence {i} about document {digest}." for i in range(60))
+            if cls.payload_bytes:
+                # Repeat the paragraph so that the whole TEI document, with every paragraph slot
+                # filled, reaches the requested size
+                frame_bytes = len(TEI_TEMPLATE.format(digest=digest, paragraph='').encode('utf-8'))
+                paragraph_bytes = max(0, cls.payload_bytes - frame_bytes) // TEI_TEMPLATE.count('{paragraph}')
+                repeats = paragraph_bytes // len(paragraph) + 1
+                paragraph = ' '.join([paragraph] * repeats)[:paragraph_bytes]
+            payload = TEI_TEMPLATE.format(digest=digest, paragraph=paragraph).encode('utf-8')
+        finally:
+            with cls.lock:
+                cls.active_requests -= 1
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/xml')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        logging.debug(f"Stub GROBID: {format % args}")
+
+
+def make_grobid_handler(latency=0.0, latency_jitter=0.0, busy_rate=0.0, max_concurrent=None, payload_bytes=None):
+    """Return a StubGrobidHandler subclass with its own latency, 503 and payload settings.
+
+    latency and latency_jitter are the mean and standard deviation of the processing time in
+    seconds, busy_rate is the probability of a random 503, max_concurrent the number of
+    requests served at once before answering 503, and payload_bytes the approximate size
+    of the returned TEI document in bytes.
+    """
+    return type('ConfiguredStubGrobidHandler', (StubGrobidHandler,), {
+        'latency': latency,
+        'latency_jitter': latency_jitter,
+        'busy_rate': busy_rate,
+        'max_concurrent': max_concurrent,
+        'payload_bytes': payload_bytes,
+        'active_requests': 0,
+        'lock': threading.Lock(),
+    })
+
+
+class StubEmbeddingHandler(BaseHTTPRequestHandler):
+    """Answer OpenAI-style /v1/embeddings requests with deterministic vectors."""
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    dimensions = 16
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if not self.path.startswith('/v1/embeddings'):
+            self.send_error(404)
+            return
+
+        request = json.loads(body)
+        inputs = request['input'] if isinstance(request['input'], list) else [request['input']]
+
+        data = []
+        for i, text in enumerate(inputs):
+            digest = hashlib.sha256(text.encode('utf-8')).digest()
+            vector = [byte / 255.0 for byte in digest[:self.dimensions]]
+            data.append({"object": "embedding", "index": i, "embedding": vector})
+
+        payload = json.dumps({"object": "list", "data": data, "model": request.get('model')}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        logging.debug(f"Stub embeddings: {format % args}")
+
+
+def start_stub_server(handler_class, host='127.0.0.1', port=0):
+    """Start a stub server in a daemon thread and return it together with its base URL."""
+    server = ThreadingHTTPServer((host, port), handler_class)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://{server.server_address[0]}:{server.server_address[1]}"
+    logging.info(f"Started {handler_class.__name__} on {url}")
+    return server, url
+
+
+if __name__ == "__main__":
+    # Serve both stubs on the default GROBID port and a neighbouring one until interrupted
+    grobid_server, grobid_url = start_stub_server(StubGrobidHandler, port=8070)
+    embedding_server, embedding_url = start_stub_server(StubEmbeddingHandler, port=8071)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        grobid_server.shutdown()
+        embedding_server.shutdown()
@@ -1,15 +1,36 @@
+import threading
+import time
 import httpx
 
 class GrobidClient:
-    def __init__(self, host="http://localhost:8070", timeout=300):
+    def __init__(self, host="http://localhost:8070", timeout=300, max_connections=10, max_retries=5, retry_delay=1.0):
         self.host = host
         self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        # One pooled client shared by all threads, so connections are reused between PDFs
+        self.client = httpx.Client(timeout=timeout, limits=httpx.Limits(max_connections=max_connections,
+                                                                         max_keepalive_connections=max_connections))
+        self.busy_responses = 0
+        self._lock = threading.Lock()
 
     def process(self, service, pdf_path, output):
-        files = {'input': open(pdf_path, 'rb')}
-        response = httpx.post(f"{self.host}/api/{service}", files=files, timeout=self.timeout)
+        for attempt in range(self.max_retries + 1):
+            with open(pdf_path, 'rb') as pdf_file:
+                response = self.client.post(f"{self.host}/api/{service}", files={'input': pdf_file})
+            if response.status_code != 503:
+                break
+            # GROBID answers 503 while all its workers are busy; back off and try again
+            with self._lock:
+                self.busy_responses += 1
+            if attempt < self.max_retries:
+                time.sleep(self.retry_delay * (attempt + 1))
+
         if response.status_code == 200:
             with open(output, 'wb') as f:
                 f.write(response.content)
         else:
             response.raise_for_status()
+
+    def close(self):
+        self.client.close()